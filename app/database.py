@@ -1,5 +1,10 @@
 import os
-from sqlmodel import SQLModel, create_engine, Session
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, List
+from sqlalchemy import URL, Connection, Table, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine, Session, text
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Import all models to ensure they're registered. ToDo: replace with specific imports when possible.
 from app.models import *  # noqa: F401, F403
@@ -8,15 +13,109 @@ DATABASE_URL = os.environ.get("APP_DATABASE_URL", "postgresql://postgres:postgre
 ENGINE = create_engine(DATABASE_URL, connect_args={"connect_timeout": 15, "options": "-c statement_timeout=1000"})
 
 
+def _async_url(url: str) -> URL:
+    """Point a libpq-style connection string at the asyncpg driver."""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    if "sslmode" in async_url.query:
+        sslmode = async_url.query["sslmode"]
+        sslmode = sslmode if isinstance(sslmode, str) else sslmode[-1]
+        async_url = async_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return async_url
+
+
+ASYNC_ENGINE = create_async_engine(
+    _async_url(DATABASE_URL),
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    # Bounded LRU of compiled SQL shared by all connections; headroom over the default 500 entries keeps the
+    # hot query shapes (loader presets, selectin batches, paged lookups) from being evicted and recompiled
+    query_cache_size=1200,
+    connect_args={
+        "timeout": 15,
+        "server_settings": {"statement_timeout": "1000"},
+        # asyncpg prepared statements cached per pooled connection by SQLAlchemy's asyncpg adapter
+        "prepared_statement_cache_size": 500,
+    },
+)
+ASYNC_SESSION_FACTORY = async_sessionmaker(ASYNC_ENGINE, class_=AsyncSession, expire_on_commit=False)
+
+
 def create_tables():
     SQLModel.metadata.create_all(ENGINE)
+    create_partitions()
+
+
+def _partitioned_tables() -> List[Table]:
+    return [table for table in SQLModel.metadata.sorted_tables if table.dialect_options["postgresql"]["partition_by"]]
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def create_partitions(months_ahead: int = 1) -> None:
+    """Create monthly partitions for every table partitioned by RANGE (created_at).
+
+    Covers the current month plus `months_ahead` months, behind a DEFAULT partition that catches rows outside
+    the prepared range. Idempotent: it runs on startup and daily from a timer registered in main.py.
+    """
+    first_month = datetime.now(timezone.utc).date().replace(day=1)
+    with ENGINE.begin() as conn:
+        # Row moves can outlast the engine-wide 1 s statement_timeout; lock_timeout instead keeps the DDL from
+        # queueing behind a long transaction while blocking every other query on the table
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        for table in _partitioned_tables():
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT"))
+            month = first_month
+            for _ in range(months_ahead + 1):
+                next_month = _next_month(month)
+                _create_month_partition(conn, table, month, next_month)
+                month = next_month
+
+
+def _create_month_partition(conn: Connection, table: Table, month: date, next_month: date) -> None:
+    """Attach `<table>_YYYY_MM`, first moving any rows for that month out of the DEFAULT partition.
+
+    Postgres refuses to add a partition while the DEFAULT partition holds rows in its range, so rows that
+    landed there while the month was missing are moved into the new table before it is attached.
+    """
+    name = f"{table.name}_{month:%Y_%m}"
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    lower, upper = f"{month} 00:00:00+00", f"{next_month} 00:00:00+00"
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {table.name}_default WHERE created_at >= :lower AND created_at < :upper "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lower": lower, "upper": upper},
+    )
+    conn.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
 
 
 def get_session():
     return Session(ENGINE)
 
 
+def get_async_session() -> AsyncSession:
+    return ASYNC_SESSION_FACTORY()
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency yielding an async session per request, e.g. `session: AsyncSession = Depends(get_db)`.
+
+    Model helpers on the request path have awaited `_async` variants built from the same statements as their sync
+    counterparts, e.g. `await VoucherCode.allocate_async(session, product_id, order_item_id)`.
+    """
+    async with ASYNC_SESSION_FACTORY() as session:
+        yield session
+
+
 def reset_db():
     """Wipe all tables in the database. Use with caution - for testing only!"""
     SQLModel.metadata.drop_all(ENGINE)
-    SQLModel.metadata.create_all(ENGINE)
+    create_tables()
@@ -1,9 +1,161 @@
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlmodel import (
+    SQLModel,
+    Field,
+    Relationship,
+    Column,
+    String,
+    DDL,
+    Index,
+    Numeric,
+    DateTime,
+    Enum as SAEnum,
+    Session,
+    UniqueConstraint,
+    col,
+    delete,
+    desc,
+    false,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy import Insert, Select, Update, event
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.sql.dml import ReturningDelete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import MappedSQLExpression, deferred, joinedload, raiseload, selectinload, undefer
 from datetime import datetime
+from uuid import UUID
+import os
+import re
+import time
+from pydantic import ConfigDict, StringConstraints, field_validator
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any, Tuple, TypeVar
 from enum import Enum
 
+_Model = TypeVar("_Model", bound=SQLModel)
+
+# Rows per multi-row INSERT; keeps each statement well under the 32767 bind-parameter limit
+VOUCHER_BULK_BATCH_SIZE = 1000
+
+# Bounded repetitions over disjoint character classes keep matching linear-time, even on hostile input
+_EMAIL_RE = re.compile(r"[A-Za-z0-9_.+-]{1,64}@[A-Za-z0-9-]{1,253}\.[A-Za-z0-9.-]{2,63}", re.ASCII)
+
+# Crockford base32, as used by ULID text encoding
+_REFERENCE_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_REFERENCE_LENGTH = 26
+
+
+def new_reference() -> UUID:
+    """Generate a UUIDv7: a 48-bit Unix millisecond timestamp followed by random bits.
+
+    The values sort by creation time, so unique indexes on reference columns grow at their right edge instead of
+    taking random page splits as UUIDv4 would.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10))
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return UUID(int=value)
+
+
+def format_reference(reference: UUID) -> str:
+    """Render a reference as the 26-character ULID-style string shown to customers and payment gateways."""
+    value = reference.int
+    chars = []
+    for _ in range(_REFERENCE_LENGTH):
+        chars.append(_REFERENCE_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def parse_reference(text_value: str) -> UUID:
+    """Inverse of format_reference; also accepts the canonical hyphenated UUID form."""
+    cleaned = text_value.strip().upper()
+    if len(cleaned) != _REFERENCE_LENGTH:
+        return UUID(cleaned)
+    value = 0
+    for char in cleaned:
+        index = _REFERENCE_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Invalid character {char!r} in reference {text_value!r}")
+        value = value << 5 | index
+    if value >> 128:
+        raise ValueError(f"Reference {text_value!r} is out of range")
+    return UUID(int=value)
+
+
+def _validate_email(value: str) -> str:
+    if _EMAIL_RE.fullmatch(value) is None:
+        raise ValueError("Invalid email address")
+    return value
+
+
+def _created_at_column(primary_key: bool = False) -> Column:
+    """Timezone-aware timestamp filled in by Postgres on insert.
+
+    Range-partitioned tables pass primary_key=True, since Postgres requires the partition key in the primary key.
+    """
+    return Column(DateTime(timezone=True), server_default=func.now(), nullable=False, primary_key=primary_key)
+
+
+def _updated_at_column() -> Column:
+    """Like _created_at_column, but also refreshed to now() on every ORM update.
+
+    Models using it set eager_defaults, so the new value comes back with RETURNING instead of being left expired
+    (reading an expired attribute from an AsyncSession would raise rather than issue the implicit SELECT).
+    """
+    return Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+def _timestamp_column() -> Column:
+    """Nullable timezone-aware timestamp set by the application (paid_at, completed_at, ...)."""
+    return Column(DateTime(timezone=True))
+
+
+def _jsonb_column() -> Column:
+    """JSONB column defaulting to an empty object.
+
+    Field(default_factory=dict) only covers model instances; sa_column bypasses it, so the Column needs its own
+    default for Core inserts (bulk_create, pg_insert) that leave the column out.
+    """
+    return Column(JSONB, default=dict)
+
+
+def _enum_column(
+    enum_cls: type[Enum], name: str, nullable: bool = False, server_default: Optional[Enum] = None
+) -> Column:
+    """Column of a native Postgres enum type labelled with the member values ("pending"), not the member names."""
+    enum_type = SAEnum(enum_cls, name=name, values_callable=lambda members: [member.value for member in members])
+    return Column(
+        enum_type,
+        nullable=nullable,
+        server_default=server_default.value if server_default is not None else None,
+    )
+
+
+class _PartitionedById(SQLModel):
+    """Base for tables range-partitioned by created_at (see _created_at_column).
+
+    Their primary key is (id, created_at), so session.get(model, id) does not work; get_by_id looks a row up by id
+    alone, which stays unique because every partition draws it from the same sequence.
+    """
+
+    @classmethod
+    def get_by_id(cls: type[_Model], session: Session, row_id: int) -> Optional[_Model]:
+        return session.exec(select(cls).where(col(getattr(cls, "id")) == row_id)).first()
+
+
+def _deferred(field: Any, group: Optional[str] = None) -> MappedSQLExpression[Any]:
+    """Deferred mapping of a Field(sa_column=...) declared earlier in the class body, for __mapper_args__.
+
+    The column is left out of the default SELECT. Queries that need it should load it up front with undefer() or
+    undefer_group(): a sync Session loads it lazily on first access (one query per object), an AsyncSession
+    raises instead, and model_dump() silently leaves out deferred columns that were never loaded.
+    """
+    return deferred(field.sa_column, group=group)
+
 
 # Enums for various statuses and types
 class OrderStatus(str, Enum):
@@ -53,21 +205,55 @@ class User(SQLModel, table=True):
     __tablename__ = "users"  # type: ignore[assignment]
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    email: str = Field(unique=True, max_length=255, regex=r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+    email: str = Field(unique=True, max_length=255)
     username: str = Field(unique=True, max_length=50)
     full_name: str = Field(max_length=100)
     phone_number: Optional[str] = Field(default=None, max_length=20)
     password_hash: str = Field(max_length=255)
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
-    wallet_balance: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    wallet_balance: Decimal = Field(
+        default=Decimal("0"), max_digits=18, decimal_places=2, sa_column_kwargs={"server_default": "0"}
+    )
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    @field_validator("email")
+    @classmethod
+    def check_email(cls, value: str) -> str:
+        return _validate_email(value)
 
     # Relationships
     orders: List["Order"] = Relationship(back_populates="user")
-    transactions: List["Transaction"] = Relationship(back_populates="user")
-    wallet_transactions: List["WalletTransaction"] = Relationship(back_populates="user")
+
+    # Transaction histories are unbounded, so they are paged queries rather than relationship collections
+    @classmethod
+    def recent_transactions(
+        cls, session: Session, user_id: int, limit: int = 50, offset: int = 0
+    ) -> List["Transaction"]:
+        query = (
+            select(Transaction)
+            .where(Transaction.user_id == user_id)
+            .order_by(desc(Transaction.created_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(query).all())
+
+    @classmethod
+    def recent_wallet_transactions(
+        cls, session: Session, user_id: int, limit: int = 50, offset: int = 0
+    ) -> List["WalletTransaction"]:
+        query = (
+            select(WalletTransaction)
+            .where(WalletTransaction.user_id == user_id)
+            .order_by(desc(WalletTransaction.created_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(query).all())
 
 
 # Game categories and products
@@ -77,12 +263,20 @@ class Game(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=100, unique=True)
     slug: str = Field(max_length=100, unique=True)
-    description: str = Field(default="", max_length=1000)
+    description: str = Field(default="", max_length=1000, sa_column=Column(String(1000), nullable=False, default=""))
     image_url: Optional[str] = Field(default=None, max_length=500)
-    banner_url: Optional[str] = Field(default=None, max_length=500)
+    banner_url: Optional[str] = Field(default=None, max_length=500, sa_column=Column(String(500)))
     is_active: bool = Field(default=True)
     sort_order: int = Field(default=0)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+
+    # Only the game page shows these; lists load them on access or via undefer_group("game_page")
+    __mapper_args__ = {
+        "properties": {
+            "description": _deferred(description, group="game_page"),
+            "banner_url": _deferred(banner_url, group="game_page"),
+        }
+    }
 
     # Relationships
     products: List["Product"] = Relationship(back_populates="game")
@@ -94,18 +288,20 @@ class Product(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     game_id: int = Field(foreign_key="games.id")
     name: str = Field(max_length=200)
-    description: str = Field(default="", max_length=1000)
-    price: Decimal = Field(decimal_places=2)
+    description: str = Field(default="", max_length=1000, sa_column=Column(String(1000), nullable=False, default=""))
+    price: Decimal = Field(max_digits=18, decimal_places=2)
     currency: str = Field(default="IDR", max_length=3)
-    product_type: ProductType
+    product_type: ProductType = Field(sa_column=_enum_column(ProductType, "product_type"))
 
     # For voucher products
     voucher_code_template: Optional[str] = Field(default=None, max_length=500)
 
     # For external provider products
-    external_provider_type: Optional[ExternalProviderType] = Field(default=None)
+    external_provider_type: Optional[ExternalProviderType] = Field(
+        default=None, sa_column=_enum_column(ExternalProviderType, "external_provider_type", nullable=True)
+    )
     external_product_id: Optional[str] = Field(default=None, max_length=100)
-    external_provider_config: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    external_provider_config: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
 
     # Stock management
     stock_quantity: Optional[int] = Field(default=None)  # None for unlimited
@@ -113,40 +309,146 @@ class Product(SQLModel, table=True):
     sort_order: int = Field(default=0)
 
     # Additional data
-    extra_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    extra_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True, "properties": {"description": _deferred(description)}}
 
     # Relationships
     game: Game = Relationship(back_populates="products")
-    order_items: List["OrderItem"] = Relationship(back_populates="product")
     voucher_codes: List["VoucherCode"] = Relationship(back_populates="product")
 
+    @classmethod
+    def recent_order_items(
+        cls, session: Session, product_id: int, limit: int = 50, offset: int = 0
+    ) -> List["OrderItem"]:
+        query = (
+            select(OrderItem)
+            .where(OrderItem.product_id == product_id)
+            .order_by(desc(OrderItem.created_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(query).all())
+
 
 # Voucher management for automatic delivery
 class VoucherCode(SQLModel, table=True):
     __tablename__ = "voucher_codes"  # type: ignore[assignment]
+    __table_args__ = (
+        # Partial index: only the allocatable subset of codes is kept in the index, in allocation order
+        Index("ix_voucher_unused", "product_id", "id", postgresql_where=text("is_used = false")),
+        UniqueConstraint("product_id", "code", name="uq_voucher_codes_product_code"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     product_id: int = Field(foreign_key="products.id")
     code: str = Field(max_length=500)
     serial_number: Optional[str] = Field(default=None, max_length=500)
     is_used: bool = Field(default=False)
-    used_at: Optional[datetime] = Field(default=None)
-    order_item_id: Optional[int] = Field(default=None, foreign_key="order_items.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    used_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    order_item_id: Optional[int] = Field(default=None, foreign_key="order_items.id", ondelete="SET NULL")
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
 
     # Relationships
-    product: Product = Relationship(back_populates="voucher_codes")
+    product: Product = Relationship(back_populates="voucher_codes", sa_relationship_kwargs={"lazy": "joined"})
     order_item: Optional["OrderItem"] = Relationship(back_populates="voucher_codes")
 
+    @classmethod
+    def bulk_create(cls, session: Session, product_id: int, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert voucher codes for a product with one multi-row INSERT per batch.
+
+        Each row needs a `code` and may carry a `serial_number`. Codes already stored for the product are
+        skipped. Returns the ids of the inserted rows; committing is left to the caller.
+        """
+        inserted_ids: List[int] = []
+        for stmt in cls.bulk_create_statements(product_id, rows):
+            inserted_ids.extend(session.execute(stmt).scalars().all())
+        return inserted_ids
+
+    @classmethod
+    async def bulk_create_async(cls, session: AsyncSession, product_id: int, rows: List[Dict[str, Any]]) -> List[int]:
+        inserted_ids: List[int] = []
+        for stmt in cls.bulk_create_statements(product_id, rows):
+            inserted_ids.extend((await session.execute(stmt)).scalars().all())
+        return inserted_ids
+
+    @classmethod
+    def bulk_create_statements(cls, product_id: int, rows: List[Dict[str, Any]]) -> List[Insert]:
+        """The INSERT ... ON CONFLICT DO NOTHING RETURNING id batches run by bulk_create()."""
+        statements: List[Insert] = []
+        for start in range(0, len(rows), VOUCHER_BULK_BATCH_SIZE):
+            values = [
+                {"product_id": product_id, "code": row["code"], "serial_number": row.get("serial_number")}
+                for row in rows[start : start + VOUCHER_BULK_BATCH_SIZE]
+            ]
+            statements.append(
+                pg_insert(cls)
+                .values(values)
+                .on_conflict_do_nothing(index_elements=["product_id", "code"])
+                .returning(col(cls.id))
+            )
+        return statements
+
+    @classmethod
+    def allocate(cls, session: Session, product_id: int, order_item_id: int) -> Optional[Tuple[str, Optional[str]]]:
+        """Claim the oldest unused code of a product for an order item in a single UPDATE.
+
+        Codes locked by a concurrent allocation are skipped instead of waited on, so parallel purchases never
+        receive the same code. Returns (code, serial_number), or None when the product has no unused codes left.
+        Committing is left to the caller.
+        """
+        row = session.execute(cls.allocate_statement(product_id, order_item_id)).first()
+        if row is None:
+            return None
+        return row.code, row.serial_number
+
+    @classmethod
+    async def allocate_async(
+        cls, session: AsyncSession, product_id: int, order_item_id: int
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        row = (await session.execute(cls.allocate_statement(product_id, order_item_id))).first()
+        if row is None:
+            return None
+        return row.code, row.serial_number
+
+    @classmethod
+    def allocate_statement(cls, product_id: int, order_item_id: int) -> Update:
+        """The UPDATE ... RETURNING code, serial_number run by allocate()."""
+        # is_used = false must stay literal for the planner to pick the ix_voucher_unused partial index
+        candidate = (
+            select(col(cls.id))
+            .where(col(cls.product_id) == product_id, col(cls.is_used) == false())
+            .order_by(col(cls.id))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return (
+            update(cls)
+            .where(col(cls.id) == candidate)
+            .values(is_used=True, used_at=func.now(), order_item_id=order_item_id)
+            .returning(col(cls.code), col(cls.serial_number))
+            .execution_options(synchronize_session=False)
+        )
+
 
 # Order management system
 class Order(SQLModel, table=True):
     __tablename__ = "orders"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        Index(
+            "ix_orders_status_created",
+            "status",
+            "created_at",
+            postgresql_include=["total_amount", "items_subtotal", "currency"],
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    order_number: str = Field(unique=True, max_length=50)
+    order_number: UUID = Field(default_factory=new_reference, unique=True)
     user_id: Optional[int] = Field(default=None, foreign_key="users.id")  # None for guest orders
 
     # Guest order information
@@ -154,119 +456,269 @@ class Order(SQLModel, table=True):
     guest_phone: Optional[str] = Field(default=None, max_length=20)
 
     # Order details
-    status: OrderStatus = Field(default=OrderStatus.PENDING)
-    total_amount: Decimal = Field(decimal_places=2)
+    status: OrderStatus = Field(
+        default=OrderStatus.PENDING,
+        sa_column=_enum_column(OrderStatus, "order_status", server_default=OrderStatus.PENDING),
+    )
+    total_amount: Decimal = Field(max_digits=18, decimal_places=2)
+    # SUM(order_items.total_price), maintained by the order_items triggers below; refresh after changing items
+    items_subtotal: Decimal = Field(default=None, sa_column=Column(Numeric(18, 2), nullable=False, server_default="0"))
     currency: str = Field(default="IDR", max_length=3)
 
+    # Order processing; game account details and notes live in OrderMeta
+    processed_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    completed_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+
+    # Timestamps
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    # Relationships
+    user: Optional[User] = Relationship(back_populates="orders")
+    # Children are removed by ON DELETE CASCADE; passive_deletes spares the ORM loading them just to delete them
+    order_items: List["OrderItem"] = Relationship(
+        back_populates="order",
+        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan", "passive_deletes": True},
+    )
+    payments: List["Payment"] = Relationship(
+        back_populates="order",
+        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan", "passive_deletes": True},
+    )
+    external_orders: List["ExternalProviderOrder"] = Relationship(
+        back_populates="order",
+        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan", "passive_deletes": True},
+    )
+    # Loaded only when asked for, e.g. with joinedload(Order.meta) as in ORDER_DETAIL_LOAD. Any other access raises
+    # instead of querying, so list scans never touch order_meta and an unloaded row is never mistaken for a missing one
+    meta: Optional["OrderMeta"] = Relationship(
+        sa_relationship_kwargs={
+            "lazy": "raise_on_sql",
+            "uselist": False,
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        }
+    )
+
+    @property
+    def order_number_str(self) -> str:
+        return format_reference(self.order_number)
+
+    @classmethod
+    def delete_by_id(cls, session: Session, order_id: int) -> bool:
+        """Delete an order with a single DELETE, leaving its items, payments and provider orders to ON DELETE CASCADE.
+
+        session.delete(order) on a loaded order still deletes each selectin-loaded child row by row; this path
+        never loads them. Returns False if no such order exists.
+        """
+        return session.execute(cls.delete_statement(order_id)).first() is not None
+
+    @classmethod
+    async def delete_by_id_async(cls, session: AsyncSession, order_id: int) -> bool:
+        return (await session.execute(cls.delete_statement(order_id))).first() is not None
+
+    @classmethod
+    def delete_statement(cls, order_id: int) -> ReturningDelete[Tuple[Optional[int]]]:
+        """The DELETE ... RETURNING id run by delete_by_id()."""
+        return delete(cls).where(col(cls.id) == order_id).returning(col(cls.id))
+
+
+class OrderMeta(SQLModel, table=True):
+    """Cold per-order data, split from Order so order-list scans read narrower rows."""
+
+    __tablename__ = "order_meta"  # type: ignore[assignment]
+
+    order_id: Optional[int] = Field(default=None, primary_key=True, foreign_key="orders.id", ondelete="CASCADE")
+
     # Game account information
     game_account_id: Optional[str] = Field(default=None, max_length=200)
-    game_account_info: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    game_account_info: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
 
     # Order processing
     notes: Optional[str] = Field(default=None, max_length=1000)
     admin_notes: Optional[str] = Field(default=None, max_length=1000)
-    processed_at: Optional[datetime] = Field(default=None)
-    completed_at: Optional[datetime] = Field(default=None)
-
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    # Relationships
-    user: Optional[User] = Relationship(back_populates="orders")
-    order_items: List["OrderItem"] = Relationship(back_populates="order")
-    payments: List["Payment"] = Relationship(back_populates="order")
-    external_orders: List["ExternalProviderOrder"] = Relationship(back_populates="order")
 
 
 class OrderItem(SQLModel, table=True):
     __tablename__ = "order_items"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_product_created", "product_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    order_id: int = Field(foreign_key="orders.id")
+    order_id: int = Field(foreign_key="orders.id", ondelete="CASCADE")
     product_id: int = Field(foreign_key="products.id")
     quantity: int = Field(default=1)
-    unit_price: Decimal = Field(decimal_places=2)
-    total_price: Decimal = Field(decimal_places=2)
+    unit_price: Decimal = Field(max_digits=18, decimal_places=2)
+    total_price: Decimal = Field(max_digits=18, decimal_places=2)
 
     # Delivery information
     is_delivered: bool = Field(default=False)
-    delivered_at: Optional[datetime] = Field(default=None)
-    delivery_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    delivered_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    delivery_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
 
     # External provider tracking
     external_reference_id: Optional[str] = Field(default=None, max_length=200)
     external_status: Optional[str] = Field(default=None, max_length=50)
 
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
 
     # Relationships
     order: Order = Relationship(back_populates="order_items")
-    product: Product = Relationship(back_populates="order_items")
-    voucher_codes: List[VoucherCode] = Relationship(back_populates="order_item")
+    product: Product = Relationship(sa_relationship_kwargs={"lazy": "joined"})
+    # Vouchers outlive the item; ON DELETE SET NULL detaches them in the database
+    voucher_codes: List[VoucherCode] = Relationship(
+        back_populates="order_item", sa_relationship_kwargs={"lazy": "selectin", "passive_deletes": True}
+    )
+
+
+# Keep orders.items_subtotal in step with order_items. Statement-level triggers with transition tables
+# recompute only the orders touched by a statement, once per statement rather than once per row.
+# Postgres does not allow transition tables on multi-event triggers, hence one trigger per event.
+_ORDER_SUBTOTAL_FUNCTION = """
+CREATE OR REPLACE FUNCTION recompute_order_subtotals() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    changed integer[];
+BEGIN
+    -- Each trigger only defines the transition tables of its own event
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT order_id) INTO changed FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT order_id) INTO changed FROM old_rows;
+    ELSE
+        SELECT array_agg(order_id) INTO changed
+        FROM (SELECT order_id FROM new_rows UNION SELECT order_id FROM old_rows) AS touched;
+    END IF;
+    -- Lock the orders before summing: under READ COMMITTED the UPDATE below then starts with a snapshot taken
+    -- after any concurrent writer of the same orders committed, so its items are included. NO KEY UPDATE does
+    -- not conflict with the KEY SHARE locks that inserting items takes on their order through the foreign key.
+    PERFORM 1 FROM orders WHERE id = ANY(changed) ORDER BY id FOR NO KEY UPDATE;
+    -- Skip orders whose subtotal is unchanged, so e.g. marking an item delivered does not rewrite its order
+    UPDATE orders
+    SET items_subtotal = totals.subtotal
+    FROM (
+        SELECT changed_id AS order_id, COALESCE(SUM(order_items.total_price), 0) AS subtotal
+        FROM unnest(changed) AS changed_id
+        LEFT JOIN order_items ON order_items.order_id = changed_id
+        GROUP BY changed_id
+    ) AS totals
+    WHERE orders.id = totals.order_id AND orders.items_subtotal IS DISTINCT FROM totals.subtotal;
+    RETURN NULL;
+END;
+$$
+"""
+_order_items_table = OrderItem.__table__  # type: ignore[attr-defined]
+event.listen(_order_items_table, "after_create", DDL(_ORDER_SUBTOTAL_FUNCTION).execute_if(dialect="postgresql"))
+for _event, _transition_tables in (
+    ("INSERT", "NEW TABLE AS new_rows"),
+    ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("DELETE", "OLD TABLE AS old_rows"),
+):
+    _trigger = DDL(
+        f"CREATE TRIGGER order_items_subtotal_{_event.lower()} AFTER {_event} ON order_items "
+        f"REFERENCING {_transition_tables} FOR EACH STATEMENT EXECUTE FUNCTION recompute_order_subtotals()"
+    )
+    event.listen(_order_items_table, "after_create", _trigger.execute_if(dialect="postgresql"))
 
 
 # Payment system
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_payments_order_status", "order_id", "status"),
+        Index("ix_payments_status_created", "status", "created_at"),
+        # Expression index so callbacks can be matched by reference without reading the whole payload
+        Index("ix_payments_callback_ref", text("(duitku_callback_data->>'reference')")),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    order_id: int = Field(foreign_key="orders.id")
-    payment_reference: str = Field(unique=True, max_length=100)
-    payment_method: PaymentMethod
-    status: PaymentStatus = Field(default=PaymentStatus.PENDING)
-    amount: Decimal = Field(decimal_places=2)
+    order_id: int = Field(foreign_key="orders.id", ondelete="CASCADE")
+    payment_reference: UUID = Field(default_factory=new_reference, unique=True)
+    payment_method: PaymentMethod = Field(sa_column=_enum_column(PaymentMethod, "payment_method"))
+    status: PaymentStatus = Field(
+        default=PaymentStatus.PENDING,
+        sa_column=_enum_column(PaymentStatus, "payment_status", server_default=PaymentStatus.PENDING),
+    )
+    amount: Decimal = Field(max_digits=18, decimal_places=2)
     currency: str = Field(default="IDR", max_length=3)
 
     # Duitku integration
     duitku_merchant_code: Optional[str] = Field(default=None, max_length=20)
     duitku_payment_method: Optional[str] = Field(default=None, max_length=50)
     duitku_reference: Optional[str] = Field(default=None, max_length=100)
-    duitku_callback_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    duitku_callback_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
 
-    # Payment URLs
-    payment_url: Optional[str] = Field(default=None, max_length=500)
-    callback_url: Optional[str] = Field(default=None, max_length=500)
-    return_url: Optional[str] = Field(default=None, max_length=500)
+    # Payment URLs, loaded together on first access or up front with undefer_group("payment_urls")
+    payment_url: Optional[str] = Field(default=None, max_length=500, sa_column=Column(String(500)))
+    callback_url: Optional[str] = Field(default=None, max_length=500, sa_column=Column(String(500)))
+    return_url: Optional[str] = Field(default=None, max_length=500, sa_column=Column(String(500)))
 
     # Timestamps
-    expires_at: Optional[datetime] = Field(default=None)
-    paid_at: Optional[datetime] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    paid_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {
+        "eager_defaults": True,
+        "properties": {
+            "payment_url": _deferred(payment_url, group="payment_urls"),
+            "callback_url": _deferred(callback_url, group="payment_urls"),
+            "return_url": _deferred(return_url, group="payment_urls"),
+        },
+    }
 
     # Relationships
     order: Order = Relationship(back_populates="payments")
 
+    @property
+    def payment_reference_str(self) -> str:
+        return format_reference(self.payment_reference)
+
 
 # Wallet and transaction management
-class WalletTransaction(SQLModel, table=True):
+class WalletTransaction(_PartitionedById, table=True):
     __tablename__ = "wallet_transactions"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_wallet_transactions_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     user_id: int = Field(foreign_key="users.id")
-    transaction_type: TransactionType
-    amount: Decimal = Field(decimal_places=2)
-    balance_before: Decimal = Field(decimal_places=2)
-    balance_after: Decimal = Field(decimal_places=2)
+    transaction_type: TransactionType = Field(sa_column=_enum_column(TransactionType, "transaction_type"))
+    amount: Decimal = Field(max_digits=18, decimal_places=2)
+    balance_before: Decimal = Field(max_digits=18, decimal_places=2)
+    balance_after: Decimal = Field(max_digits=18, decimal_places=2)
     reference_id: Optional[str] = Field(default=None, max_length=100)
     reference_type: Optional[str] = Field(default=None, max_length=50)  # 'order', 'payment', 'deposit'
     description: str = Field(max_length=500)
-    extra_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    extra_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    created_at: datetime = Field(default=None, sa_column=_created_at_column(primary_key=True))
 
     # Relationships
-    user: User = Relationship(back_populates="wallet_transactions")
+    user: User = Relationship()
+
+    @classmethod
+    def sum_amount(cls, session: Session, user_id: int, transaction_type: Optional[TransactionType] = None) -> Decimal:
+        """Sum a user's transaction amounts in Postgres instead of materializing every row."""
+        query = select(func.coalesce(func.sum(cls.amount), 0)).where(cls.user_id == user_id)
+        if transaction_type is not None:
+            query = query.where(cls.transaction_type == transaction_type)
+        return Decimal(session.exec(query).one())
 
 
 class Transaction(SQLModel, table=True):
     __tablename__ = "transactions"  # type: ignore[assignment]
+    __table_args__ = (Index("ix_transactions_user_created", "user_id", "created_at"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="users.id")  # None for guest transactions
-    transaction_reference: str = Field(unique=True, max_length=100)
-    transaction_type: TransactionType
-    amount: Decimal = Field(decimal_places=2)
+    transaction_reference: UUID = Field(default_factory=new_reference, unique=True)
+    transaction_type: TransactionType = Field(sa_column=_enum_column(TransactionType, "transaction_type"))
+    amount: Decimal = Field(max_digits=18, decimal_places=2)
     currency: str = Field(default="IDR", max_length=3)
     status: str = Field(max_length=50)
 
@@ -276,12 +728,16 @@ class Transaction(SQLModel, table=True):
 
     # Additional data
     description: str = Field(max_length=500)
-    extra_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    processed_at: Optional[datetime] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    extra_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    processed_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
 
     # Relationships
-    user: Optional[User] = Relationship(back_populates="transactions")
+    user: Optional[User] = Relationship()
+
+    @property
+    def transaction_reference_str(self) -> str:
+        return format_reference(self.transaction_reference)
 
 
 # External provider integration
@@ -290,7 +746,7 @@ class ExternalProvider(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=100)
-    provider_type: ExternalProviderType
+    provider_type: ExternalProviderType = Field(sa_column=_enum_column(ExternalProviderType, "external_provider_type"))
     is_active: bool = Field(default=True)
 
     # API configuration
@@ -299,38 +755,53 @@ class ExternalProvider(SQLModel, table=True):
     api_secret: Optional[str] = Field(default=None, max_length=255)
 
     # Configuration and settings
-    config: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    # Relationships
-    external_orders: List["ExternalProviderOrder"] = Relationship(back_populates="provider")
+    config: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    @classmethod
+    def recent_external_orders(
+        cls, session: Session, provider_id: int, limit: int = 50, offset: int = 0
+    ) -> List["ExternalProviderOrder"]:
+        query = (
+            select(ExternalProviderOrder)
+            .where(ExternalProviderOrder.provider_id == provider_id)
+            .order_by(desc(ExternalProviderOrder.sent_at))
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(session.exec(query).all())
 
 
 class ExternalProviderOrder(SQLModel, table=True):
     __tablename__ = "external_provider_orders"  # type: ignore[assignment]
+    __table_args__ = (Index("ix_external_provider_orders_provider_sent", "provider_id", "sent_at"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    order_id: int = Field(foreign_key="orders.id")
+    order_id: int = Field(foreign_key="orders.id", ondelete="CASCADE")
     provider_id: int = Field(foreign_key="external_providers.id")
 
     # Provider tracking
     provider_reference_id: str = Field(max_length=200)
     provider_status: str = Field(max_length=50)
-    provider_message: Optional[str] = Field(default=None, max_length=1000)
+    provider_message: Optional[str] = Field(default=None, max_length=1000, sa_column=Column(String(1000)))
 
     # Request and response data
-    request_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    response_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    request_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    response_data: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
 
     # Timestamps
-    sent_at: datetime = Field(default_factory=datetime.utcnow)
-    last_updated_at: datetime = Field(default_factory=datetime.utcnow)
-    completed_at: Optional[datetime] = Field(default=None)
+    sent_at: datetime = Field(default=None, sa_column=_created_at_column())
+    last_updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+    completed_at: Optional[datetime] = Field(default=None, sa_column=_timestamp_column())
+
+    __mapper_args__ = {"eager_defaults": True, "properties": {"provider_message": _deferred(provider_message)}}
 
     # Relationships
     order: Order = Relationship(back_populates="external_orders")
-    provider: ExternalProvider = Relationship(back_populates="external_orders")
+    provider: ExternalProvider = Relationship(sa_relationship_kwargs={"lazy": "joined"})
 
 
 # System configuration and settings
@@ -343,74 +814,138 @@ class SystemConfig(SQLModel, table=True):
     data_type: str = Field(default="string", max_length=20)  # string, integer, decimal, boolean, json
     description: Optional[str] = Field(default=None, max_length=500)
     is_public: bool = Field(default=False)  # Can be exposed to frontend
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default=None, sa_column=_created_at_column())
+    updated_at: datetime = Field(default=None, sa_column=_updated_at_column())
+
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # Admin and audit logging
-class AdminLog(SQLModel, table=True):
+class AdminLog(_PartitionedById, table=True):
     __tablename__ = "admin_logs"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_admin_logs_newvals", "new_values", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     admin_user_id: int = Field(foreign_key="users.id")
     action: str = Field(max_length=100)
     resource_type: str = Field(max_length=50)
     resource_id: Optional[int] = Field(default=None)
-    old_values: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    new_values: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    old_values: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
+    new_values: Dict[str, Any] = Field(default_factory=dict, sa_column=_jsonb_column())
     ip_address: Optional[str] = Field(default=None, max_length=45)
-    user_agent: Optional[str] = Field(default=None, max_length=500)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    user_agent: Optional[str] = Field(default=None, max_length=500, sa_column=Column(String(500)))
+    created_at: datetime = Field(default=None, sa_column=_created_at_column(primary_key=True))
+
+    __mapper_args__ = {"properties": {"user_agent": _deferred(user_agent)}}
 
 
 # Non-persistent schemas for validation and API requests/responses
 
 
+class _RequestSchema(SQLModel):
+    """Base for request bodies: unknown keys are rejected instead of being silently dropped, surrounding
+    whitespace is trimmed, and str_max_length caps any string field that lacks its own max_length."""
+
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True, str_max_length=1000)  # type: ignore[assignment]
+
+
+# Passwords and API keys are exempt from whitespace trimming, so they are stored and checked exactly as sent
+_Secret = Annotated[str, StringConstraints(strip_whitespace=False)]
+
+
 # User schemas
-class UserCreate(SQLModel, table=False):
-    email: str = Field(max_length=255, regex=r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+class UserCreate(_RequestSchema, table=False):
+    email: str = Field(max_length=255)
     username: str = Field(max_length=50)
     full_name: str = Field(max_length=100)
     phone_number: Optional[str] = Field(default=None, max_length=20)
-    password: str = Field(min_length=8, max_length=255)
+    password: _Secret = Field(min_length=8, max_length=255)
 
+    @field_validator("email")
+    @classmethod
+    def check_email(cls, value: str) -> str:
+        return _validate_email(value)
 
-class UserUpdate(SQLModel, table=False):
+
+class UserUpdate(_RequestSchema, table=False):
     full_name: Optional[str] = Field(default=None, max_length=100)
     phone_number: Optional[str] = Field(default=None, max_length=20)
 
 
-class UserLogin(SQLModel, table=False):
+class UserLogin(_RequestSchema, table=False):
+    model_config = ConfigDict(frozen=True)  # type: ignore[assignment]
+
     email: str = Field(max_length=255)
-    password: str = Field(max_length=255)
+    password: _Secret = Field(max_length=255)
 
 
 # Order schemas
-class OrderCreate(SQLModel, table=False):
+class OrderCreate(_RequestSchema, table=False):
     user_id: Optional[int] = Field(default=None)
     guest_email: Optional[str] = Field(default=None, max_length=255)
     guest_phone: Optional[str] = Field(default=None, max_length=20)
     game_account_id: Optional[str] = Field(default=None, max_length=200)
-    game_account_info: Dict[str, Any] = Field(default={})
+    game_account_info: Dict[str, Any] = Field(default_factory=dict)
     notes: Optional[str] = Field(default=None, max_length=1000)
 
 
-class OrderItemCreate(SQLModel, table=False):
+class OrderItemCreate(_RequestSchema, table=False):
     product_id: int
     quantity: int = Field(default=1, ge=1)
 
 
-class OrderUpdate(SQLModel, table=False):
+class OrderUpdate(_RequestSchema, table=False):
     status: Optional[OrderStatus] = Field(default=None)
     admin_notes: Optional[str] = Field(default=None, max_length=1000)
 
 
+class OrderListItem(SQLModel, table=False):
+    """Order row as shown in listings, read straight from the selected columns without building ORM objects."""
+
+    id: int
+    order_number: UUID
+    status: OrderStatus
+    total_amount: Decimal
+    items_subtotal: Decimal
+    currency: str
+    created_at: datetime
+
+    @property
+    def order_number_str(self) -> str:
+        return format_reference(self.order_number)
+
+    @classmethod
+    def recent_statement(cls, user_id: Optional[int] = None, limit: int = 50, offset: int = 0) -> Select:
+        """SELECT of just the listing columns, newest first; runs on a Session or an AsyncSession alike."""
+        query = select(*[getattr(Order, name) for name in cls.model_fields])
+        if user_id is not None:
+            query = query.where(Order.user_id == user_id)
+        return query.order_by(desc(Order.created_at)).offset(offset).limit(limit)
+
+    @classmethod
+    def recent(
+        cls, session: Session, user_id: Optional[int] = None, limit: int = 50, offset: int = 0
+    ) -> List["OrderListItem"]:
+        rows = session.execute(cls.recent_statement(user_id, limit, offset)).mappings()
+        return [cls.model_validate(row) for row in rows]
+
+    @classmethod
+    async def recent_async(
+        cls, session: AsyncSession, user_id: Optional[int] = None, limit: int = 50, offset: int = 0
+    ) -> List["OrderListItem"]:
+        rows = (await session.execute(cls.recent_statement(user_id, limit, offset))).mappings()
+        return [cls.model_validate(row) for row in rows]
+
+
 # Product schemas
-class ProductCreate(SQLModel, table=False):
+class ProductCreate(_RequestSchema, table=False):
     game_id: int
     name: str = Field(max_length=200)
     description: str = Field(default="", max_length=1000)
-    price: Decimal = Field(decimal_places=2, ge=0)
+    price: Decimal = Field(max_digits=18, decimal_places=2, ge=0)
     product_type: ProductType
     voucher_code_template: Optional[str] = Field(default=None, max_length=500)
     external_provider_type: Optional[ExternalProviderType] = Field(default=None)
@@ -418,30 +953,33 @@ class ProductCreate(SQLModel, table=False):
     stock_quantity: Optional[int] = Field(default=None, ge=0)
 
 
-class ProductUpdate(SQLModel, table=False):
+class ProductUpdate(_RequestSchema, table=False):
     name: Optional[str] = Field(default=None, max_length=200)
     description: Optional[str] = Field(default=None, max_length=1000)
-    price: Optional[Decimal] = Field(default=None, decimal_places=2, ge=0)
+    price: Optional[Decimal] = Field(default=None, max_digits=18, decimal_places=2, ge=0)
     stock_quantity: Optional[int] = Field(default=None, ge=0)
     is_active: Optional[bool] = Field(default=None)
 
 
 # Payment schemas
-class PaymentCreate(SQLModel, table=False):
+class PaymentCreate(_RequestSchema, table=False):
     order_id: int
     payment_method: PaymentMethod
-    amount: Decimal = Field(decimal_places=2, gt=0)
+    amount: Decimal = Field(max_digits=18, decimal_places=2, gt=0)
     return_url: Optional[str] = Field(default=None, max_length=500)
 
 
-class PaymentCallback(SQLModel, table=False):
+class PaymentCallback(_RequestSchema, table=False):
+    # Provider callbacks carry more keys than we model; drop them rather than failing the callback.
+    model_config = ConfigDict(extra="ignore")  # type: ignore[assignment]
+
     payment_reference: str = Field(max_length=100)
     status: PaymentStatus
-    duitku_callback_data: Dict[str, Any] = Field(default={})
+    duitku_callback_data: Dict[str, Any] = Field(default_factory=dict)
 
 
 # Game schemas
-class GameCreate(SQLModel, table=False):
+class GameCreate(_RequestSchema, table=False):
     name: str = Field(max_length=100)
     slug: str = Field(max_length=100)
     description: str = Field(default="", max_length=1000)
@@ -449,7 +987,7 @@ class GameCreate(SQLModel, table=False):
     banner_url: Optional[str] = Field(default=None, max_length=500)
 
 
-class GameUpdate(SQLModel, table=False):
+class GameUpdate(_RequestSchema, table=False):
     name: Optional[str] = Field(default=None, max_length=100)
     description: Optional[str] = Field(default=None, max_length=1000)
     image_url: Optional[str] = Field(default=None, max_length=500)
@@ -458,22 +996,53 @@ class GameUpdate(SQLModel, table=False):
 
 
 # Wallet schemas
-class WalletDeposit(SQLModel, table=False):
-    amount: Decimal = Field(decimal_places=2, gt=0)
+class WalletDeposit(_RequestSchema, table=False):
+    amount: Decimal = Field(max_digits=18, decimal_places=2, gt=0)
     payment_method: PaymentMethod
 
 
-class VoucherCodeCreate(SQLModel, table=False):
+class VoucherCodeCreate(_RequestSchema, table=False):
     product_id: int
     code: str = Field(max_length=500)
     serial_number: Optional[str] = Field(default=None, max_length=500)
 
 
 # External provider schemas
-class ExternalProviderCreate(SQLModel, table=False):
+class ExternalProviderCreate(_RequestSchema, table=False):
     name: str = Field(max_length=100)
     provider_type: ExternalProviderType
     api_url: str = Field(max_length=500)
-    api_key: str = Field(max_length=255)
-    api_secret: Optional[str] = Field(default=None, max_length=255)
-    config: Dict[str, Any] = Field(default={})
+    api_key: _Secret = Field(max_length=255)
+    api_secret: Optional[_Secret] = Field(default=None, max_length=255)
+    config: Dict[str, Any] = Field(default_factory=dict)
+
+
+# Loader options for hot query paths, e.g. session.exec(select(Order).options(*ORDER_DETAIL_LOAD)).
+# Each tuple ends with raiseload("*", sql_only=True) so a lazy load that would emit SQL raises instead of
+# silently issuing one query per row; many-to-one lookups served from the identity map still work.
+ORDER_LIST_LOAD = (
+    selectinload(Order.order_items).options(  # type: ignore[arg-type]
+        joinedload(OrderItem.product),  # type: ignore[arg-type]
+        raiseload("*", sql_only=True),
+    ),
+    raiseload("*", sql_only=True),
+)
+ORDER_DETAIL_LOAD = (
+    selectinload(Order.order_items).options(  # type: ignore[arg-type]
+        joinedload(OrderItem.product),  # type: ignore[arg-type]
+        selectinload(OrderItem.voucher_codes),  # type: ignore[arg-type]
+    ),
+    selectinload(Order.payments).undefer_group("payment_urls"),  # type: ignore[arg-type]
+    joinedload(Order.meta),  # type: ignore[arg-type]
+    selectinload(Order.external_orders).options(  # type: ignore[arg-type]
+        joinedload(ExternalProviderOrder.provider),  # type: ignore[arg-type]
+        undefer(ExternalProviderOrder.provider_message),  # type: ignore[arg-type]
+    ),
+    raiseload("*", sql_only=True),
+)
+PRODUCT_CATALOG_LOAD = (
+    joinedload(Product.game),  # type: ignore[arg-type]
+    undefer(Product.description),  # type: ignore[arg-type]
+    raiseload("*", sql_only=True),
+)
+USER_PROFILE_LOAD = (raiseload("*", sql_only=True),)
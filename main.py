@@ -1,7 +1,8 @@
 import logging
 import os
+from app.database import ASYNC_ENGINE, create_partitions
 from app.startup import startup
-from nicegui import app, ui
+from nicegui import app, run, ui
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -30,6 +31,9 @@ async def health():
 logging.getLogger("sqlalchemy.engine.Engine").setLevel(logging.WARNING)
 
 app.on_startup(startup)
+app.on_shutdown(ASYNC_ENGINE.dispose)
+# startup() already prepared this month's partitions; keep the next month's ready without a restart
+app.timer(24 * 60 * 60, lambda: run.io_bound(create_partitions), immediate=False)
 
 # Add security headers middleware
 app.add_middleware(SecurityHeadersMiddleware)
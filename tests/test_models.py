@@ -0,0 +1,173 @@
+"""Logic tests for model helpers that do not need a database."""
+
+import pytest
+from decimal import Decimal
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel, select
+from uuid import UUID
+
+from app.models import (
+    AdminLog,
+    ExternalProviderOrder,
+    Game,
+    Order,
+    OrderCreate,
+    OrderListItem,
+    OrderMeta,
+    Payment,
+    PaymentCallback,
+    PaymentStatus,
+    Product,
+    User,
+    UserCreate,
+    UserLogin,
+    VoucherCode,
+    format_reference,
+    new_reference,
+    parse_reference,
+)
+
+
+def test_new_reference_is_uuid7():
+    reference = new_reference()
+    assert reference.version == 7
+    assert reference.variant == "specified in RFC 4122"
+
+
+def test_new_reference_is_time_ordered():
+    earlier = new_reference()
+    later = new_reference()
+    # the leading 48 bits hold the millisecond timestamp
+    assert earlier.int >> 80 <= later.int >> 80
+
+
+def test_reference_round_trip():
+    reference = new_reference()
+    formatted = format_reference(reference)
+    assert len(formatted) == 26
+    assert parse_reference(formatted) == reference
+    assert parse_reference(formatted.lower()) == reference
+    assert parse_reference(str(reference)) == reference
+
+
+def test_format_reference_bounds():
+    assert format_reference(UUID(int=0)) == "0" * 26
+    assert format_reference(UUID(int=2**128 - 1)) == "7" + "Z" * 25
+
+
+def test_parse_reference_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        parse_reference("8" + "0" * 25)
+    with pytest.raises(ValueError):
+        parse_reference("U" * 26)
+    with pytest.raises(ValueError):
+        parse_reference("not-a-reference")
+
+
+def test_order_gets_reference_by_default():
+    order = Order(total_amount=Decimal("1"))
+    assert isinstance(order.order_number, UUID)
+    assert parse_reference(order.order_number_str) == order.order_number
+
+
+@pytest.mark.parametrize("email", ["alice@example.com", "a.b+tag@mail.example.co.id", "user_1@host-name.io"])
+def test_user_create_accepts_valid_email(email):
+    user = UserCreate(email=email, username="alice", full_name="Alice", password="secret123")
+    assert user.email == email
+
+
+@pytest.mark.parametrize(
+    "email", ["plainaddress", "alice@", "@example.com", "alice@example", "alice@example.c", "alice@exa mple.com"]
+)
+def test_user_create_rejects_invalid_email(email):
+    with pytest.raises(ValidationError):
+        UserCreate(email=email, username="alice", full_name="Alice", password="secret123")
+
+
+@pytest.mark.parametrize("email", ["not-an-email", "alice@example.com\n"])
+def test_user_validates_email(email):
+    with pytest.raises(ValidationError):
+        User.model_validate({"email": email, "username": "a", "full_name": "A", "password_hash": "x"})
+
+
+def test_json_defaults_are_not_shared():
+    first = OrderMeta(order_id=1)
+    second = OrderMeta(order_id=2)
+    first.game_account_info["server"] = "asia"
+    assert second.game_account_info == {}
+
+    create = OrderCreate()
+    create.game_account_info["zone"] = "1"
+    assert OrderCreate().game_account_info == {}
+
+
+def test_json_columns_default_for_core_inserts():
+    json_columns = [
+        column
+        for table in SQLModel.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, postgresql.JSONB)
+    ]
+    assert json_columns
+    for column in json_columns:
+        assert column.default is not None, column
+
+
+def test_field_defaults_reach_the_column():
+    # sa_column= bypasses Field(default=...), so the Column needs its own default for Core inserts
+    for mapper in SQLModel._sa_registry.mappers:
+        model = mapper.class_
+        for name, field in model.model_fields.items():
+            if field.is_required() or (field.default is None and field.default_factory is None):
+                continue
+            column = model.__table__.c[name]
+            assert column.default is not None or column.server_default is not None, column
+
+
+def test_request_schemas_reject_unknown_fields():
+    with pytest.raises(ValidationError):
+        OrderCreate.model_validate({"notes": "hi", "total_amount": "0"})
+
+
+def test_request_schemas_strip_whitespace_but_not_credentials():
+    assert OrderCreate(notes="  deliver fast  ").notes == "deliver fast"
+    user = UserCreate(email=" alice@example.com\n", username=" alice ", full_name="Alice", password=" secret123 ")
+    assert (user.email, user.username, user.password) == ("alice@example.com", "alice", " secret123 ")
+    login = UserLogin(email="alice@example.com", password=" secret ")
+    assert login.password == " secret "
+    with pytest.raises(ValidationError):
+        login.password = "other"
+
+
+def test_payment_callback_ignores_extra_provider_keys():
+    callback = PaymentCallback.model_validate({"payment_reference": "ref", "status": "paid", "merchantCode": "D1"})
+    assert callback.status == PaymentStatus.PAID
+
+
+def test_order_list_item_fields_are_order_columns():
+    columns = Order.__table__.c  # type: ignore[attr-defined]
+    assert all(name in columns for name in OrderListItem.model_fields)
+
+
+@pytest.mark.parametrize(
+    "model, columns",
+    [
+        (Game, ["description", "banner_url"]),
+        (Product, ["description"]),
+        (Payment, ["payment_url", "callback_url", "return_url"]),
+        (ExternalProviderOrder, ["provider_message"]),
+        (AdminLog, ["user_agent"]),
+    ],
+)
+def test_wide_columns_are_deferred(model, columns):
+    sql = str(select(model))
+    table = model.__tablename__
+    assert f"{table}.id" in sql
+    assert not [column for column in columns if f"{table}.{column}" in sql]
+
+
+def test_allocate_statement_skips_locked_unused_codes():
+    sql = str(VoucherCode.allocate_statement(1, 2).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "is_used = false" in sql
@@ -0,0 +1,398 @@
+"""Database tests for model helpers and triggers; they need Postgres and run with `pytest -m sqlmodel`."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.attributes import instance_state
+from sqlmodel import Session, col, func, insert, select, text
+
+from app.database import ASYNC_ENGINE, ASYNC_SESSION_FACTORY, ENGINE, create_partitions, reset_db
+from app.models import (
+    ORDER_DETAIL_LOAD,
+    ORDER_LIST_LOAD,
+    PRODUCT_CATALOG_LOAD,
+    USER_PROFILE_LOAD,
+    VOUCHER_BULK_BATCH_SIZE,
+    AdminLog,
+    ExternalProvider,
+    ExternalProviderOrder,
+    ExternalProviderType,
+    Game,
+    Order,
+    OrderItem,
+    OrderListItem,
+    OrderMeta,
+    OrderStatus,
+    Payment,
+    PaymentMethod,
+    Product,
+    ProductType,
+    TransactionType,
+    User,
+    VoucherCode,
+    WalletTransaction,
+)
+
+
+@pytest.fixture
+def session():
+    reset_db()
+    with Session(ENGINE) as session:
+        yield session
+
+
+@pytest.fixture
+def product(session: Session) -> Product:
+    game = Game(name="Mobile Legends", slug="mobile-legends")
+    session.add(game)
+    session.flush()
+    assert game.id is not None
+    product = Product(game_id=game.id, name="86 Diamonds", price=Decimal("20000"), product_type=ProductType.VOUCHER)
+    session.add(product)
+    session.commit()
+    return product
+
+
+def _new_order(session: Session) -> Order:
+    order = Order(total_amount=Decimal("0"))
+    session.add(order)
+    session.commit()
+    return order
+
+
+def _add_item(session: Session, order_id: int, product_id: int, price: str) -> OrderItem:
+    item = OrderItem(order_id=order_id, product_id=product_id, unit_price=Decimal(price), total_price=Decimal(price))
+    session.add(item)
+    session.flush()
+    return item
+
+
+def _subtotal(session: Session, order_id: int) -> Decimal:
+    return session.exec(select(col(Order.items_subtotal)).where(Order.id == order_id)).one()
+
+
+def _row_version(session: Session, order_id: int) -> str:
+    return session.execute(text("SELECT xmin::text FROM orders WHERE id = :id"), {"id": order_id}).scalar_one()
+
+
+@pytest.mark.sqlmodel
+def test_items_subtotal_follows_item_changes(session: Session, product: Product):
+    assert product.id is not None
+    order = _new_order(session)
+    assert order.id is not None
+    first = _add_item(session, order.id, product.id, "10000")
+    _add_item(session, order.id, product.id, "5000")
+    session.commit()
+    assert _subtotal(session, order.id) == Decimal("15000")
+
+    first.total_price = Decimal("12000")
+    session.commit()
+    assert _subtotal(session, order.id) == Decimal("17000")
+
+    # An update that leaves the subtotal alone must not rewrite the order row
+    row_version = _row_version(session, order.id)
+    first.is_delivered = True
+    session.commit()
+    assert _row_version(session, order.id) == row_version
+
+    session.delete(first)
+    session.commit()
+    assert _subtotal(session, order.id) == Decimal("5000")
+
+
+@pytest.mark.sqlmodel
+def test_items_subtotal_includes_concurrent_inserts(session: Session, product: Product):
+    assert product.id is not None
+    order = _new_order(session)
+    order_id, product_id = order.id, product.id
+    assert order_id is not None
+
+    with Session(ENGINE) as first, Session(ENGINE) as second:
+        _add_item(first, order_id, product_id, "10000")  # trigger now holds the order row lock
+
+        def insert_blocked_item():
+            _add_item(second, order_id, product_id, "5000")
+            second.commit()
+
+        worker = threading.Thread(target=insert_blocked_item)
+        worker.start()
+        time.sleep(0.3)  # let the second trigger block on the lock held by the first transaction
+        first.commit()
+        worker.join()
+
+    assert _subtotal(session, order_id) == Decimal("15000")
+
+
+@pytest.mark.sqlmodel
+def test_create_partitions_moves_rows_out_of_default(session: Session):
+    admin = User(email="admin@example.com", username="admin", full_name="Admin", password_hash="x")
+    session.add(admin)
+    session.commit()
+    assert admin.id is not None
+    month_partition = f"admin_logs_{datetime.now(timezone.utc):%Y_%m}"
+    session.execute(text(f"ALTER TABLE admin_logs DETACH PARTITION {month_partition}"))
+    session.execute(text(f"DROP TABLE {month_partition}"))
+    session.commit()
+
+    log = AdminLog(admin_user_id=admin.id, action="update", resource_type="product")
+    session.add(log)
+    session.commit()
+    log_id = log.id
+    assert log_id is not None
+    session.commit()  # end the read transaction so the partition DDL can take its locks
+
+    create_partitions()  # would fail if the row were left in admin_logs_default
+    located = session.execute(text("SELECT tableoid::regclass::text FROM admin_logs WHERE id = :id"), {"id": log_id})
+    assert located.scalar_one() == month_partition
+    found = AdminLog.get_by_id(session, log_id)
+    assert found is not None and found.action == "update"
+
+    deposit = WalletTransaction(
+        user_id=admin.id,
+        transaction_type=TransactionType.DEPOSIT,
+        amount=Decimal("50000"),
+        balance_before=Decimal("0"),
+        balance_after=Decimal("50000"),
+        description="Top up",
+    )
+    session.add(deposit)
+    session.commit()
+    assert deposit.id is not None
+    found_deposit = WalletTransaction.get_by_id(session, deposit.id)
+    assert found_deposit is not None and found_deposit.amount == Decimal("50000")
+
+
+@pytest.mark.sqlmodel
+def test_updated_at_is_returned_and_timestamps_are_aware():
+    reset_db()
+    with Session(ENGINE, expire_on_commit=False) as session:
+        order = Order(total_amount=Decimal("10000"))
+        session.add(order)
+        session.commit()
+        created = order.updated_at
+
+        order.status = OrderStatus.PROCESSING
+        order.processed_at = datetime.now(timezone.utc)
+        session.commit()
+        # eager_defaults brings the server-side onupdate value back instead of leaving it expired
+        assert "updated_at" in order.__dict__
+        assert order.updated_at >= created
+        # Every timestamp column is timestamptz, so these compare without mixing naive and aware values
+        assert order.processed_at is not None and order.processed_at >= order.created_at
+
+
+@pytest.mark.sqlmodel
+def test_allocate_hands_out_distinct_codes_until_exhausted(session: Session, product: Product):
+    assert product.id is not None
+    order = _new_order(session)
+    assert order.id is not None
+    item = _add_item(session, order.id, product.id, "20000")
+    VoucherCode.bulk_create(session, product.id, [{"code": "AAA-1"}, {"code": "AAA-2", "serial_number": "SN-2"}])
+    session.commit()
+    product_id, item_id = product.id, item.id
+    assert item_id is not None
+
+    # Both transactions stay open, so the second one has to skip the row locked by the first
+    with Session(ENGINE) as first, Session(ENGINE) as second:
+        claimed_first = VoucherCode.allocate(first, product_id, item_id)
+        claimed_second = VoucherCode.allocate(second, product_id, item_id)
+        first.commit()
+        second.commit()
+    assert claimed_first == ("AAA-1", None)
+    assert claimed_second == ("AAA-2", "SN-2")
+
+    assert VoucherCode.allocate(session, product_id, item_id) is None
+
+
+@pytest.mark.sqlmodel
+def test_bulk_create_inserts_in_batches_and_skips_duplicates(session: Session, product: Product):
+    assert product.id is not None
+    rows = [{"code": f"CODE-{number}"} for number in range(VOUCHER_BULK_BATCH_SIZE * 2 + 500)]
+    first_ids = VoucherCode.bulk_create(session, product.id, rows[:10])
+    ids = VoucherCode.bulk_create(session, product.id, rows + rows[-5:])
+    session.commit()
+
+    assert len(first_ids) == 10
+    assert len(ids) == len(rows) - 10
+    stored = session.exec(select(func.count()).select_from(VoucherCode).where(VoucherCode.product_id == product.id))
+    assert stored.one() == len(rows)
+
+
+@pytest.mark.sqlmodel
+def test_core_insert_fills_column_defaults(session: Session, product: Product):
+    session.execute(insert(Game).values(name="Free Fire", slug="free-fire"))
+    session.execute(
+        insert(Product).values(
+            game_id=product.game_id, name="172 Diamonds", price=40000, product_type=ProductType.VOUCHER
+        )
+    )
+    session.commit()
+    game = session.exec(select(Game).where(Game.slug == "free-fire")).one()
+    stored = session.exec(select(Product).where(Product.name == "172 Diamonds")).one()
+    assert game.description == "" and stored.description == ""
+    assert stored.extra_data == {} and stored.external_provider_config == {}
+
+
+@pytest.mark.sqlmodel
+def test_delete_by_id_cascades_to_children(session: Session, product: Product):
+    assert product.id is not None
+    provider = ExternalProvider(
+        name="Digiflazz", provider_type=ExternalProviderType.DIGIFLAZZ, api_url="https://api.example.com", api_key="k"
+    )
+    session.add(provider)
+    order = Order(total_amount=Decimal("20000"))
+    session.add(order)
+    session.flush()
+    assert order.id is not None and provider.id is not None
+    session.add(OrderMeta(order_id=order.id, notes="gift"))
+    item = _add_item(session, order.id, product.id, "20000")
+    session.add(Payment(order_id=order.id, payment_method=PaymentMethod.WALLET, amount=Decimal("20000")))
+    session.add(
+        ExternalProviderOrder(
+            order_id=order.id, provider_id=provider.id, provider_reference_id="REF-1", provider_status="sent"
+        )
+    )
+    VoucherCode.bulk_create(session, product.id, [{"code": "GIFT-1"}])
+    assert item.id is not None
+    VoucherCode.allocate(session, product.id, item.id)
+    session.commit()
+    order_id = order.id
+    session.expunge_all()
+
+    assert Order.delete_by_id(session, order_id)
+    assert not Order.delete_by_id(session, order_id)
+    session.commit()
+
+    for model in (OrderItem, Payment, ExternalProviderOrder, OrderMeta):
+        assert session.exec(select(func.count()).select_from(model)).one() == 0
+    voucher = session.exec(select(VoucherCode)).one()
+    assert voucher.is_used and voucher.order_item_id is None
+
+
+@pytest.mark.sqlmodel
+async def test_async_session_helpers(session: Session, product: Product):
+    assert product.id is not None
+    order = _new_order(session)
+    assert order.id is not None
+    item = _add_item(session, order.id, product.id, "20000")
+    session.commit()
+    order_id, product_id, item_id = order.id, product.id, item.id
+    assert item_id is not None
+
+    try:
+        async with ASYNC_SESSION_FACTORY() as async_session:
+            inserted = await VoucherCode.bulk_create_async(async_session, product_id, [{"code": "ASYNC-1"}])
+            listed = await OrderListItem.recent_async(async_session)
+            claimed = await VoucherCode.allocate_async(async_session, product_id, item_id)
+            exhausted = await VoucherCode.allocate_async(async_session, product_id, item_id)
+            deleted = await Order.delete_by_id_async(async_session, order_id)
+            await async_session.commit()
+    finally:
+        await ASYNC_ENGINE.dispose()  # pooled asyncpg connections belong to this test's event loop
+
+    assert len(inserted) == 1
+    assert [row.id for row in listed] == [order_id]
+    assert listed[0].items_subtotal == Decimal("20000")
+    assert claimed == ("ASYNC-1", None)
+    assert exhausted is None
+    assert deleted
+    assert session.exec(select(func.count()).select_from(OrderItem)).one() == 0
+
+
+def _order_with_everything(session: Session, product: Product) -> None:
+    """Store an order with a user, meta, an item holding a voucher, and a payment with URLs."""
+    assert product.id is not None
+    user = User(email="buyer@example.com", username="buyer", full_name="Buyer", password_hash="x")
+    session.add(user)
+    session.flush()
+    order = Order(user_id=user.id, total_amount=Decimal("20000"))
+    session.add(order)
+    session.flush()
+    assert order.id is not None
+    session.add(OrderMeta(order_id=order.id, game_account_id="12345"))
+    item = _add_item(session, order.id, product.id, "20000")
+    session.add(
+        Payment(
+            order_id=order.id, payment_method=PaymentMethod.WALLET, amount=Decimal("20000"), payment_url="https://pay"
+        )
+    )
+    VoucherCode.bulk_create(session, product.id, [{"code": "LOAD-1"}])
+    assert item.id is not None
+    VoucherCode.allocate(session, product.id, item.id)
+    session.commit()
+
+
+@pytest.mark.sqlmodel
+def test_order_detail_load_reads_the_detail_page_up_front(session: Session, product: Product):
+    _order_with_everything(session, product)
+    with Session(ENGINE) as fresh:
+        order = fresh.exec(select(Order).options(*ORDER_DETAIL_LOAD)).one()
+        assert instance_state(order).unloaded == {"user"}
+        [item] = order.order_items
+        assert "voucher_codes" not in instance_state(item).unloaded
+        assert [voucher.code for voucher in item.voucher_codes] == ["LOAD-1"]
+        assert item.product.name == "86 Diamonds"
+        assert order.meta is not None and order.meta.game_account_id == "12345"
+        [payment] = order.payments
+        assert not {"payment_url", "callback_url", "return_url"} & instance_state(payment).unloaded
+        with pytest.raises(InvalidRequestError):
+            order.user
+
+
+@pytest.mark.sqlmodel
+def test_order_list_load_raises_on_detail_only_relationships(session: Session, product: Product):
+    _order_with_everything(session, product)
+    with Session(ENGINE) as fresh:
+        order = fresh.exec(select(Order).options(*ORDER_LIST_LOAD)).one()
+        [item] = order.order_items
+        assert item.product.name == "86 Diamonds"
+        for load in (lambda: order.payments, lambda: order.meta, lambda: item.voucher_codes):
+            with pytest.raises(InvalidRequestError):
+                load()
+
+
+@pytest.mark.sqlmodel
+def test_catalog_and_profile_loads(session: Session, product: Product):
+    _order_with_everything(session, product)
+    with Session(ENGINE) as fresh:
+        listed = fresh.exec(select(Product).options(*PRODUCT_CATALOG_LOAD)).one()
+        assert not {"game", "description"} & instance_state(listed).unloaded
+        assert listed.game.slug == "mobile-legends"
+        with pytest.raises(InvalidRequestError):
+            listed.voucher_codes
+
+        user = fresh.exec(select(User).options(*USER_PROFILE_LOAD)).one()
+        with pytest.raises(InvalidRequestError):
+            user.orders
+
+
+@pytest.mark.sqlmodel
+def test_order_meta_written_through_relationship_reads_back_via_detail_load(session: Session):
+    order = Order(total_amount=Decimal("20000"))
+    order.meta = OrderMeta(game_account_id="12345", notes="gift")
+    session.add(order)
+    session.commit()
+    order_id = order.id
+    assert order_id is not None
+
+    with Session(ENGINE) as fresh:
+        loaded = fresh.get(Order, order_id)
+        assert loaded is not None
+        # An unloaded meta raises rather than reading as None, so callers cannot mistake it for a missing row
+        with pytest.raises(InvalidRequestError):
+            loaded.meta
+
+    with Session(ENGINE) as fresh:
+        detail = fresh.exec(select(Order).options(*ORDER_DETAIL_LOAD).where(Order.id == order_id)).one()
+        assert detail.meta is not None and detail.meta.game_account_id == "12345"
+        detail.meta.admin_notes = "checked"
+        fresh.commit()
+
+    with Session(ENGINE) as fresh:
+        detail = fresh.exec(select(Order).options(*ORDER_DETAIL_LOAD).where(Order.id == order_id)).one()
+        assert detail.meta is not None
+        assert (detail.meta.notes, detail.meta.admin_notes) == ("gift", "checked")